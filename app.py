@@ -1,68 +1,117 @@
 """Main application class for Moodler."""
 
+import asyncio
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
 import os
+import queue
 import threading
-from pathlib import Path
+import time
 from typing import Optional
 import win32con
 import win32gui
 import win32api
-from openai import OpenAI
 import logging
 
-import getpass
-import keyboard
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import font as tkfont, messagebox, simpledialog
 
-from PIL import ImageGrab
+import mss
 
-from config import APP_NAME, PROMPT_TEXT, MODEL_NAME, TEMP_SCREENSHOT_NAME, HOTKEYS
+from config import (
+    APP_NAME, PROMPT_TEXT, MODEL_NAME, HOTKEYS, MAX_IMAGE_EDGE, IMAGE_DETAIL, PNG_COMPRESS_LEVEL,
+    SMALL_IMAGE_PIXELS, STREAM_UPDATE_INTERVAL, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY, LABEL_FLUSH_INTERVAL_MS
+)
 from utils import (
     ensure_dpi_awareness, load_api_key, save_api_key, delete_api_key, 
-    is_valid_api_key, encode_image_to_base64, get_screen_scale
+    is_valid_api_key, encode_image_to_data_url, get_screen_scale, get_cache_path
 )
+from cache import ResponseCache, make_cache_key
+from hotkeys import HotkeyListener
 from selector import Screenshot
 
+WS_EX_NOACTIVATE = 0x08000000
+OVERLAY_EXSTYLE = (
+    win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT | win32con.WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE
+)
+
 class MoodlerApp:
     """Main application class."""
     
+    # Fixed attribute layout: state flags are checked on every hotkey, and typos fail loudly
+    __slots__ = (
+        "username", "client", "_http", "cache", "_capture_executor", "_sct", "loop",
+        "screenshot_bytes", "screenshot_loaded", "response_text", "response_shown",
+        "sending", "selecting_area", "_pending_text", "_flush_scheduled", "_payload_template",
+        "root", "_tk_thread_ident", "_label_size", "_dialog_parent", "_font", "_line_height", "label", "hotkeys",
+        "_hotkey_queue",
+    )
+    
     def __init__(self):
         ensure_dpi_awareness()
         
-        self.temp_path = Path(os.getenv("TEMP", "/tmp")) / TEMP_SCREENSHOT_NAME
-        self.username = getpass.getuser()
+        self.username = os.environ.get("USERNAME") or os.getlogin()
         self.client = None
+        self._http = None
+        api_key = load_api_key()
+        if is_valid_api_key(api_key):
+            self._create_client(api_key)
+        self.cache = ResponseCache(get_cache_path())
+        
+        # One long-lived capture thread keeps a single mss instance (and its DCs) alive
+        self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture")
+        self._sct = None
+        
+        # One persistent event loop serves every OpenAI request
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        
+        self.screenshot_bytes = None
+        self.screenshot_loaded = False
+        self.response_text = None
+        self.response_shown = False
+        self.sending = False
+        self.selecting_area = False
+        self._pending_text = None
+        self._flush_scheduled = False
+        
+        # Request payload is constant apart from the image, so build it once
+        self._payload_template = {
+            "role": "user",
+            "content": [
+                {"type": "input_text", "text": PROMPT_TEXT},
+                {"type": "input_image", "image_url": None, "detail": IMAGE_DETAIL},
+            ],
+        }
         
-        self._setup_state()
         self._create_ui()
         self._register_hotkeys()
 
-    def _setup_state(self):
-        """Initialize application state."""
-        self.state = {
-            "screenshot_path": None,
-            "screenshot_loaded": False,
-            "response_text": None,
-            "response_shown": False,
-            "sending": False,
-            "selecting_area": False,
-        }
-
     def _create_ui(self):
         """Create the main application UI."""
         self.root = tk.Tk()
+        self._tk_thread_ident = threading.get_ident()
         self.root.overrideredirect(True)
         self.root.attributes("-topmost", True)
         self.root.configure(bg="black")
         self.root.geometry("300x40+10+10")  # Initial small size
+        self._label_size = (300, 40)
+        
+        # Hidden parent for dialogs, reused instead of spinning up a new Tk interpreter each time
+        self._dialog_parent = tk.Toplevel(self.root)
+        self._dialog_parent.withdraw()
+        
+        # Label size is computed from font metrics instead of asking Tk to lay it out
+        self._font = tkfont.Font(root=self.root, family="Consolas", size=12)
+        self._line_height = self._font.metrics("linespace")
         
         self.label = tk.Label(
             self.root,
             text="",  # Start empty
             fg="lime",
             bg="black",
-            font=("Consolas", 12),
+            font=self._font,
             justify="left",
             anchor="w",
             wraplength=780,  # Set wraplength from start
@@ -79,8 +128,7 @@ class MoodlerApp:
         try:
             hwnd = self.root.winfo_id()
             exstyle = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-            exstyle |= win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT | win32con.WS_EX_TOOLWINDOW
-            exstyle |= 0x08000000  # NOACTIVATE
+            exstyle |= OVERLAY_EXSTYLE
             win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, exstyle)
             
             color_key = win32api.RGB(0, 0, 0)
@@ -89,45 +137,75 @@ class MoodlerApp:
             logging.warning(f"Could not apply window styles: {e}")
 
     def _update_label(self, text: str):
-        """Update the status label."""
-        def update():
-            self.label.config(text=text)
-            self.root.update_idletasks()
-            
-            # Force update to get proper dimensions
-            self.root.update()
-            
-            # Auto-resize window to fit content
-            width = min(self.label.winfo_reqwidth() + 20, 800)  # Increased padding
-            height = self.label.winfo_reqheight() + 10          # Increased padding
-            
-            if width >= 800:
-                self.label.config(wraplength=780)
-            
-            # Apply the new geometry
+        """Update the status label; off the Tk thread, rapid updates are coalesced into one redraw."""
+        self._pending_text = text
+        if threading.get_ident() == self._tk_thread_ident:
+            self._render_label(text)
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after(LABEL_FLUSH_INTERVAL_MS, self._flush_label)
+
+    def _flush_label(self):
+        """Render the most recent pending text."""
+        self._flush_scheduled = False
+        self._render_label(self._pending_text)
+
+    def _render_label(self, text: str):
+        """Write text to the label and resize the window to fit."""
+        self.label.config(text=text)
+        
+        # Auto-resize window to fit content; lines wider than wraplength wrap onto extra rows
+        line_widths = [self._font.measure(line) for line in text.split("\n")]
+        line_count = sum(max(1, math.ceil(w / 780)) for w in line_widths)
+        width = min(max(line_widths) + 20, 800)     # Increased padding
+        height = self._line_height * line_count + 10  # Increased padding
+        
+        # Only touch the window manager when the size actually changed
+        if (width, height) != self._label_size:
+            self._label_size = (width, height)
             self.root.geometry(f"{width}x{height}+10+10")
-            self.root.update_idletasks()
-            
-        self.root.after(0, update)
 
     def _register_hotkeys(self):
         """Register global hotkeys."""
-        try:
-            keyboard.add_hotkey(HOTKEYS["capture"], self._start_screenshot)
-            keyboard.add_hotkey(HOTKEYS["send"], self._handle_send)
-            keyboard.add_hotkey(HOTKEYS["reset"], self._reset_api_key)
-            keyboard.add_hotkey(HOTKEYS["quit"], self._cleanup_quit)
-        except Exception as e:
-            self._update_label(f"Hotkey error: {e} - Run as admin if needed")
+        handlers = {
+            HOTKEYS["capture"]: self._start_screenshot,
+            HOTKEYS["send"]: self._handle_send,
+            HOTKEYS["reset"]: self._reset_api_key,
+            HOTKEYS["quit"]: self._cleanup_quit,
+        }
+        # WM_HOTKEY arrives on the listener thread; queue the callback and wake Tk with a virtual event
+        self._hotkey_queue = queue.SimpleQueue()
+        self.root.bind("<<Hotkey>>", self._drain_hotkeys)
+        self.hotkeys = HotkeyListener(
+            {hotkey: (lambda h=handler: self._post_hotkey(h)) for hotkey, handler in handlers.items()},
+            on_error=lambda message: self._update_label(f"Hotkey error: {message}"),
+        )
+        self.hotkeys.start()
+
+    def _post_hotkey(self, handler):
+        """Queue a hotkey callback from the listener thread and wake the Tk loop."""
+        self._hotkey_queue.put(handler)
+        self.root.event_generate("<<Hotkey>>", when="tail")
+
+    def _drain_hotkeys(self, event=None):
+        """Run every queued hotkey callback on the Tk thread."""
+        while True:
+            try:
+                handler = self._hotkey_queue.get_nowait()
+            except queue.Empty:
+                return
+            handler()
 
     def _ensure_openai_client(self) -> bool:
         """Ensure OpenAI client is available and configured."""
+        if self.client is not None:
+            return True
+            
         api_key = load_api_key()
         
         if is_valid_api_key(api_key):
             try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=api_key)
+                self._create_client(api_key)
                 return True
             except Exception as e:
                 logging.error(f"OpenAI client error: {e}")
@@ -137,61 +215,93 @@ class MoodlerApp:
         # Prompt for API key
         return self._prompt_for_api_key()
 
+    def _create_client(self, api_key: str):
+        """Create OpenAI client on top of the shared HTTP connection pool."""
+        # Deferred: httpx and openai (with pydantic and friends) are only needed once a key exists
+        import httpx
+        from openai import AsyncOpenAI
+        if self._http is None:
+            # Pooled keep-alive connection so only the first request pays the TLS handshake
+            self._http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self._http)
+
     def _prompt_for_api_key(self) -> bool:
         """Prompt user for OpenAI API key."""
-        temp_root = tk.Tk()
-        temp_root.withdraw()
-        
         while True:
             api_key = simpledialog.askstring(
                 "API Key Required",
                 "Enter your OpenAI API key (starts with sk-...):",
                 show="*",
-                parent=temp_root,
+                parent=self._dialog_parent,
             )
             
             if api_key is None:
-                messagebox.showerror("Error", "API key is required", parent=temp_root)
-                temp_root.destroy()
+                messagebox.showerror("Error", "API key is required", parent=self._dialog_parent)
                 return False
                 
+            # A paste often drags a trailing newline or space along
+            api_key = api_key.strip()
             if is_valid_api_key(api_key):
                 if save_api_key(api_key):
-                    self.client = OpenAI(api_key=api_key)
-                    temp_root.destroy()
+                    self._create_client(api_key)
                     return True
                 else:
-                    messagebox.showwarning("Warning", "Failed to save API key", parent=temp_root)
+                    messagebox.showwarning("Warning", "Failed to save API key", parent=self._dialog_parent)
             else:
-                messagebox.showerror("Invalid Key", "API key must start with 'sk-'", parent=temp_root)
+                messagebox.showerror("Invalid Key", "API key must start with 'sk-'", parent=self._dialog_parent)
                 
-        temp_root.destroy()
         return False
 
     def _start_screenshot(self):
         """Start screenshot area selection."""
-        if self.state["selecting_area"] or self.state["sending"]:
+        if self.selecting_area or self.sending:
             return
             
-        self.state["selecting_area"] = True
+        self.selecting_area = True
         self._update_label("Click and drag to select area (ESC to cancel)")
         
         self.root.after(50, lambda: Screenshot(self.root, self._on_selection_complete))
 
     def _on_selection_complete(self, coords: Optional[tuple]):
         """Handle completed screenshot selection."""
-        self.state["selecting_area"] = False
+        self.selecting_area = False
         
         if not coords:
             self._update_label("(ALT+T) screenshot | (ALT+ENTER) send | (ALT+R) reset API key")
             return
 
+        # Grab and PNG-encode off the Tk thread so large regions don't freeze the UI
+        self._capture_executor.submit(self._capture_screenshot, coords)
+
+    def _capture_screenshot(self, coords: tuple):
+        """Grab and PNG-encode the selected area on the capture thread."""
         try:
-            image = ImageGrab.grab(bbox=coords)
-            image.save(self.temp_path)
+            # Deferred: PIL is only needed once something is captured, and this runs off the Tk thread
+            from PIL import Image
+            # mss handles are bound to the creating thread, so create it on the capture thread
+            if self._sct is None:
+                self._sct = mss.mss()
+            x1, y1, x2, y2 = coords
+            shot = self._sct.grab({"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1})
+            # shot.raw wraps mss's buffer directly; shot.bgra would copy the whole frame again
+            image = Image.frombuffer("RGB", shot.size, shot.raw, "raw", "BGRX", 0, 1)
+            # Extra pixels beyond this carry no signal for the model, only upload bytes and tokens
+            if max(image.size) > MAX_IMAGE_EDGE:
+                image.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+            # Deflate dominates encode time on small captures and saves little there
+            compress_level = 0 if image.width * image.height < SMALL_IMAGE_PIXELS else PNG_COMPRESS_LEVEL
+            buf = io.BytesIO()
+            image.save(buf, format="PNG", optimize=False, compress_level=compress_level)
             
-            self.state["screenshot_path"] = str(self.temp_path)
-            self.state["screenshot_loaded"] = True
+            # A view of the encoder's buffer; getvalue() would copy the whole image again
+            self.screenshot_bytes = buf.getbuffer()
+            self.screenshot_loaded = True
             
             width = abs(coords[2] - coords[0])
             height = abs(coords[3] - coords[1])
@@ -199,17 +309,23 @@ class MoodlerApp:
             
         except Exception as e:
             logging.error(f"Screenshot failed: {e}")
-            self.state["screenshot_loaded"] = False
+            self.screenshot_loaded = False
             self._update_label(f"Screenshot error: {e}")
 
+    def _close_capture(self):
+        """Release the mss instance (and its GDI DCs) on the capture thread."""
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
     def _handle_send(self):
         """Handle send hotkey based on current state."""
-        if self.state["sending"] or self.state["selecting_area"]:
+        if self.sending or self.selecting_area:
             return
             
-        if self.state["screenshot_loaded"] and not self.state["response_shown"]:
+        if self.screenshot_loaded and not self.response_shown:
             self._send_screenshot()
-        elif self.state["response_shown"]:
+        elif self.response_shown:
             self._reset_state()
 
     def _send_screenshot(self):
@@ -217,79 +333,100 @@ class MoodlerApp:
         if not self._ensure_openai_client():
             return
             
-        thread = threading.Thread(target=self._process_screenshot, daemon=True)
-        thread.start()
+        # Mark as sending before scheduling so the shared payload template is never used twice at once
+        self.sending = True
+        asyncio.run_coroutine_threadsafe(self._process_screenshot(), self.loop)
 
-    def _process_screenshot(self):
-        """Process screenshot in background thread."""
-        self.state["sending"] = True
+    async def _process_screenshot(self):
+        """Process screenshot on the asyncio loop."""
         self._update_label("Bitte warten...")
         
         try:
-            image_b64 = encode_image_to_base64(self.state["screenshot_path"])
+            image_bytes = self.screenshot_bytes
+            cache_key = make_cache_key(image_bytes, PROMPT_TEXT, MODEL_NAME)
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                self.response_text = cached_text
+                self.response_shown = True
+                self._update_label(f"{cached_text}\n\n(ALT+ENTER) continue")
+                return
             
-            response = self.client.responses.create(
+            self._payload_template["content"][1]["image_url"] = encode_image_to_data_url(image_bytes)
+            chunks = []
+            last_update = 0.0
+            async with self.client.responses.stream(
                 model=MODEL_NAME,
-                input=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": PROMPT_TEXT},
-                        {"type": "input_image", "image_url": f"data:image/png;base64,{image_b64}"},
-                    ],
-                }],
-            )
+                input=[self._payload_template],
+            ) as stream:
+                async for event in stream:
+                    if event.type != "response.output_text.delta":
+                        continue
+                    chunks.append(event.delta)
+                    # Throttle partial updates so Tk isn't flooded with redraws
+                    now = time.monotonic()
+                    if now - last_update >= STREAM_UPDATE_INTERVAL:
+                        last_update = now
+                        self._update_label("".join(chunks))
+                response = await stream.get_final_response()
             
-            result_text = getattr(response, "output_text", str(response)).strip()
-            self.state["response_text"] = result_text
-            self.state["response_shown"] = True
+            output_text = getattr(response, "output_text", None)
+            result_text = (output_text if output_text is not None else str(response)).strip()
+            self.cache.put(cache_key, result_text)
+            self.response_text = result_text
+            self.response_shown = True
             self._update_label(f"{result_text}\n\n(ALT+ENTER) continue")
             
         except Exception as e:
             logging.error(f"OpenAI request failed: {e}")
-            self.state["response_shown"] = True
+            self.response_shown = True
             self._update_label(f"❌ Error: {e}\n(ALT+ENTER) continue")
         finally:
-            self.state["sending"] = False
+            self.sending = False
 
     def _reset_state(self):
         """Reset application to initial state."""
-        self.state.update({
-            "screenshot_path": None,
-            "screenshot_loaded": False,
-            "response_text": None,
-            "response_shown": False,
-            "sending": False,
-        })
+        self.screenshot_bytes = None
+        self.screenshot_loaded = False
+        self.response_text = None
+        self.response_shown = False
+        self.sending = False
         self._update_label("(ALT+T) screenshot | (ALT+ENTER) send | (ALT+R) reset API key")
 
     def _reset_api_key(self):
         """Reset saved API key."""
-        if self.state["sending"] or self.state["selecting_area"]:
+        if self.sending or self.selecting_area:
             return
             
-        temp_root = tk.Tk()
-        temp_root.withdraw()
-        
-        if messagebox.askyesno("Reset API Key", "Reset saved API key? App will close.", parent=temp_root):
+        if messagebox.askyesno("Reset API Key", "Reset saved API key? App will close.", parent=self._dialog_parent):
             if delete_api_key():
-                messagebox.showinfo("Success", "API key reset. App will close.", parent=temp_root)
-                temp_root.destroy()
+                self.client = None
+                messagebox.showinfo("Success", "API key reset. App will close.", parent=self._dialog_parent)
                 self._cleanup_quit()
             else:
-                messagebox.showerror("Error", "Failed to reset API key", parent=temp_root)
-                temp_root.destroy()
+                messagebox.showerror("Error", "Failed to reset API key", parent=self._dialog_parent)
 
     def _show_error(self, title: str, message: str):
         """Show error message dialog."""
-        temp_root = tk.Tk()
-        temp_root.withdraw()
-        messagebox.showerror(title, message, parent=temp_root)
-        temp_root.destroy()
+        messagebox.showerror(title, message, parent=self._dialog_parent)
 
     def _cleanup_quit(self):
         """Clean up resources and quit application."""
         try:
-            keyboard.unhook_all_hotkeys()
+            self.hotkeys.stop()
+        except Exception:
+            pass
+        try:
+            self.cache.close()
+        except Exception:
+            pass
+        # mss handles belong to the capture thread, so close them there; a capture still in
+        # flight must not hold up quitting, so wait only briefly for it
+        try:
+            self._capture_executor.submit(self._close_capture).result(timeout=1)
+        except Exception:
+            pass
+        try:
+            self._capture_executor.shutdown(wait=False)
         except Exception:
             pass
             
@@ -306,7 +443,4 @@ class MoodlerApp:
         try:
             self.root.mainloop()
         finally:
-            try:
-                keyboard.unhook_all_hotkeys()
-            except Exception:
-                pass
\ No newline at end of file
+            self.hotkeys.stop()
\ No newline at end of file
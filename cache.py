@@ -0,0 +1,50 @@
+"""Local response cache for Moodler application."""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+
+import diskcache
+
+from config import CACHE_SIZE_LIMIT
+
+def make_cache_key(image_data, prompt: str, model: str) -> str:
+    """Return cache key for an image/prompt/model combination."""
+    # BLAKE2b is noticeably faster than SHA-256 on multi-MB PNGs
+    digest = hashlib.blake2b(image_data, digest_size=16)
+    digest.update(prompt.encode("utf-8"))
+    digest.update(model.encode("utf-8"))
+    return digest.hexdigest()
+
+class ResponseCache:
+    """LRU cache of OpenAI responses stored in an on-disk SQLite-backed diskcache."""
+
+    def __init__(self, path: Path, size_limit: int = CACHE_SIZE_LIMIT):
+        self.path = path
+        self._cache = diskcache.Cache(
+            str(path),
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response, if any."""
+        try:
+            return self._cache.get(key)
+        except Exception as e:
+            logging.error(f"Failed to read response cache: {e}")
+            return None
+
+    def put(self, key: str, value: str) -> bool:
+        """Store a response."""
+        try:
+            self._cache.set(key, value)
+            return True
+        except Exception as e:
+            logging.error(f"Failed to save response cache: {e}")
+            return False
+
+    def close(self):
+        """Close the underlying database."""
+        self._cache.close()
@@ -8,7 +8,17 @@ PROMPT_TEXT = (
     "Die Antwort sollte gut durchgedacht sein."
 )
 MODEL_NAME = "gpt-5"
-TEMP_SCREENSHOT_NAME = "moodler_screenshot.png"
+MAX_IMAGE_EDGE = 1024  # screenshots are downscaled so the long edge fits
+IMAGE_DETAIL = "auto"  # "low" is cheaper but blurs small print
+PNG_COMPRESS_LEVEL = 1  # fast zlib level; the PNG is short-lived and base64-inflated anyway
+SMALL_IMAGE_PIXELS = 40_000  # below this (~200x200) PNGs are stored uncompressed
+CACHE_DIR_NAME = "respcache"
+CACHE_SIZE_LIMIT = 50_000_000  # bytes
+HTTP_MAX_KEEPALIVE = 4
+HTTP_KEEPALIVE_EXPIRY = 300  # seconds
+STREAM_UPDATE_INTERVAL = 0.05  # seconds between partial label updates (~20 Hz)
+SELECTOR_HIDE_FALLBACK_MS = 50  # finish selection anyway if <Unmap> never arrives
+LABEL_FLUSH_INTERVAL_MS = 33  # coalesce label redraws to at most ~30 Hz
 
 HOTKEYS = {
     "capture": "alt+t",
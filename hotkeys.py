@@ -0,0 +1,125 @@
+"""Global hotkey handling via Win32 RegisterHotKey."""
+
+import ctypes
+import logging
+import threading
+from ctypes import wintypes
+from typing import Callable, Dict, Tuple
+
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_WIN = 0x0008
+MOD_NOREPEAT = 0x4000
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+
+MODIFIERS = {
+    "alt": MOD_ALT,
+    "ctrl": MOD_CONTROL,
+    "shift": MOD_SHIFT,
+    "win": MOD_WIN,
+}
+# Resolve the Win32 entry points once with explicit signatures, so every call takes ctypes' typed fast path
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+RegisterHotKey = _user32.RegisterHotKey
+RegisterHotKey.argtypes = (wintypes.HWND, ctypes.c_int, wintypes.UINT, wintypes.UINT)
+RegisterHotKey.restype = wintypes.BOOL
+
+UnregisterHotKey = _user32.UnregisterHotKey
+UnregisterHotKey.argtypes = (wintypes.HWND, ctypes.c_int)
+UnregisterHotKey.restype = wintypes.BOOL
+
+GetMessageW = _user32.GetMessageW
+GetMessageW.argtypes = (ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT)
+GetMessageW.restype = wintypes.BOOL
+
+PostThreadMessageW = _user32.PostThreadMessageW
+PostThreadMessageW.argtypes = (wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+PostThreadMessageW.restype = wintypes.BOOL
+
+GetCurrentThreadId = _kernel32.GetCurrentThreadId
+GetCurrentThreadId.argtypes = ()
+GetCurrentThreadId.restype = wintypes.DWORD
+
+VIRTUAL_KEYS = {
+    "enter": 0x0D,
+    "esc": 0x1B,
+    "space": 0x20,
+    "tab": 0x09,
+}
+
+def parse_hotkey(hotkey: str) -> Tuple[int, int]:
+    """Convert a hotkey string like 'alt+t' to (modifiers, virtual key code)."""
+    modifiers = 0
+    vk = None
+    for part in hotkey.lower().split("+"):
+        part = part.strip()
+        if part in MODIFIERS:
+            modifiers |= MODIFIERS[part]
+        elif part in VIRTUAL_KEYS:
+            vk = VIRTUAL_KEYS[part]
+        elif len(part) == 1 and part.isalnum():
+            vk = ord(part.upper())
+        else:
+            raise ValueError(f"Unsupported key in hotkey '{hotkey}': {part}")
+
+    if vk is None:
+        raise ValueError(f"Hotkey '{hotkey}' has no key")
+    return modifiers, vk
+
+class HotkeyListener:
+    """Registers global hotkeys and dispatches WM_HOTKEY messages from a message-pump thread."""
+
+    def __init__(self, bindings: Dict[str, Callable], on_error: Callable[[str], None]):
+        """
+        bindings: maps hotkey strings (e.g. 'alt+t') to callbacks, called on the pump thread
+        on_error: called with a message for every hotkey that could not be registered
+        """
+        self.bindings = bindings
+        self.on_error = on_error
+        self._thread_id = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start the message-pump thread."""
+        self._thread.start()
+
+    def stop(self):
+        """Ask the message-pump thread to unregister its hotkeys and exit."""
+        if self._thread_id is None:
+            return
+
+        try:
+            PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        except Exception as e:
+            logging.warning(f"Could not stop hotkey thread: {e}")
+
+    def _run(self):
+        """Register hotkeys and pump messages (hotkeys must be registered on the pumping thread)."""
+        self._thread_id = GetCurrentThreadId()
+
+        callbacks = {}
+        for hotkey_id, (hotkey, callback) in enumerate(self.bindings.items(), start=1):
+            try:
+                modifiers, vk = parse_hotkey(hotkey)
+            except ValueError as e:
+                self.on_error(str(e))
+                continue
+
+            if RegisterHotKey(None, hotkey_id, modifiers | MOD_NOREPEAT, vk):
+                callbacks[hotkey_id] = callback
+            else:
+                self.on_error(f"Could not register hotkey {hotkey} (already in use?)")
+
+        msg = wintypes.MSG()
+        while GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_HOTKEY:
+                callback = callbacks.get(msg.wParam)
+                if callback:
+                    callback()
+
+        for hotkey_id in callbacks:
+            UnregisterHotKey(None, hotkey_id)
@@ -8,16 +8,25 @@ Features:
  - Sends screenshot to OpenAI Chat Completions API with vision support
 """
 
-from app import MoodlerApp
-import base64
-import concurrent.futures
+import asyncio
+import functools
+import hashlib
+import io
+import itertools
 import json
 import logging
 import os
 import re
 import threading
+import time
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
+
+try:
+    import pybase64 as base64  # SIMD base64; same b64encode API as the stdlib module
+except ImportError:
+    import base64
 
 try:
     import pyperclip
@@ -25,11 +34,10 @@ except ImportError:
     pyperclip = None
     print("WARNING: pyperclip not available. Clipboard functionality will be disabled.", flush=True)
 
-import getpass
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 
-from PIL import ImageGrab
+import mss
 
 # Windows-only imports (wrapped in try/except so module can import on other platforms, but script expects Windows)
 try:
@@ -43,11 +51,46 @@ except Exception:
     win32con = None
     win32gui = None
 
-# OpenAI client; expects `openai` package or OpenAI Python client that exposes OpenAI
+# Win32 entry points called through ctypes, resolved once with explicit signatures
+# (handle-sized arguments stay pointer-width, and GetLastError is captured reliably)
 try:
-    from openai import OpenAI
+    from ctypes import wintypes
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _shcore = ctypes.WinDLL("shcore", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.CreateMutexW.argtypes = (ctypes.c_void_p, wintypes.BOOL, wintypes.LPCWSTR)
+    _kernel32.CreateMutexW.restype = wintypes.HANDLE
+    _shcore.SetProcessDpiAwareness.argtypes = (ctypes.c_int,)
+    _shcore.SetProcessDpiAwareness.restype = ctypes.HRESULT
+    _user32.SetProcessDPIAware.argtypes = ()
+    _user32.SetProcessDPIAware.restype = wintypes.BOOL
+
+    # Foreground-change notifications, delivered through the Tk thread's message loop
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    WinEventProc = ctypes.WINFUNCTYPE(
+        None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+    )
+    _user32.SetWinEventHook.argtypes = (
+        wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+    )
+    _user32.SetWinEventHook.restype = wintypes.HANDLE
+
+    class WINDOWPOS(ctypes.Structure):
+        _fields_ = [
+            ("hwnd", wintypes.HWND),
+            ("hwndInsertAfter", wintypes.HWND),
+            ("x", ctypes.c_int),
+            ("y", ctypes.c_int),
+            ("cx", ctypes.c_int),
+            ("cy", ctypes.c_int),
+            ("flags", wintypes.UINT),
+        ]
 except Exception:
-    OpenAI = None  # will raise later if missing
+    _user32 = None
+    _shcore = None
+    _kernel32 = None
 
 # -----------------------
 # Configuration / Constants
@@ -79,15 +122,57 @@ QUESTION_TYPE_DETECTION_PROMPT = (
     "- 'no_question': Es ist keine Frage im Bild sichtbar oder das Bild enthält keine Frage\n"
     "- 'incomplete_question': Die Frage ist abgeschnitten, unvollständig oder nicht vollständig lesbar"
 )
+# Text parts of the vision requests, built once; each send only adds the image part for its capture
+PROMPT_PARTS = {
+    "detection": {"type": "text", "text": QUESTION_TYPE_DETECTION_PROMPT},
+    "multiple_choice": {"type": "text", "text": PROMPT_MULTIPLE_CHOICE},
+    "true_false": {"type": "text", "text": PROMPT_TRUE_FALSE},
+    "open_ended": {"type": "text", "text": PROMPT_OPEN_ENDED},
+}
 MODEL_NAME = "gpt-5.2"
 AVAILABLE_MODELS = ["gpt-5.2", "gpt-4.1", "gpt-4o", "gpt-4.1-mini", "gpt-4o-mini"]
-TEMP_SCREENSHOT_NAME = "moodler_screenshot.png"
+# Picking 1 of 5 labels doesn't need the answer model; override with "detection_model" in config.json
+DETECTION_MODEL = "gpt-4o-mini"
+# Output caps per request kind; answers are a few letters or one word, so generation stops early.
+# Reasoning models count hidden reasoning against the cap, so they are left uncapped.
+MAX_OUTPUT_TOKENS = {
+    "detection": 16,
+    "multiple_choice": 32,
+    "true_false": 8,
+    "open_ended": 300,
+}
+REASONING_MODEL_PREFIXES = ("gpt-5", "o1", "o3", "o4")
+MULTIPLIER_OPTIONS = ((1, "1x"), (2, "2x"), (3, "3x"), (4, "4x"))  # (request count, button label)
+RESPONSE_CACHE_MAX_ENTRIES = 200
+# Single requests answer these types alongside detection and keep only the match (1 round trip instead of 2)
+SPECULATIVE_QUESTION_TYPES = ("multiple_choice", "true_false", "open_ended")
+# Screenshots are sent as JPEG (a fraction of the PNG size); flip for lossless PNG when debugging
+SEND_PNG = False
+IMAGE_MIME = "image/png" if SEND_PNG else "image/jpeg"
+IMAGE_DATA_URL_PREFIX = f"data:{IMAGE_MIME};base64,".encode("ascii")
+# Encoded image: bytes from the fast JPEG encoders, or a memoryview over Pillow's output BytesIO
+ImageBuffer = Union[bytes, memoryview]
+JPEG_QUALITY = 80  # default; overridable with "jpeg_quality" in config.json
+PNG_COMPRESS_LEVEL = 1  # fast zlib level; still lossless, several times quicker than the default 6
+SMALL_IMAGE_PIXELS = 40_000  # below this (~200x200) PNGs are stored uncompressed
+MAX_IMAGE_EDGE = 1024  # quiz text stays legible; fewer 512px tiles means fewer image tokens
+# Vision detail level: "low" is a flat, cheap 512px pass but blurs small print, so let the API decide
+IMAGE_DETAIL = "auto"
+STREAM_UPDATE_INTERVAL = 0.05  # seconds between partial answer updates (~20 Hz)
+HTTP_MAX_KEEPALIVE = 4  # enough for detection plus the speculative answer requests
+HTTP_KEEPALIVE_EXPIRY = 300  # seconds
+# Batch mode: queued screenshots go out as one Batch API job (half price, separate rate limits, slow)
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 30  # seconds between batch status checks
+SELECTOR_HIDE_FALLBACK_MS = 50  # grab anyway if the selector's <Unmap> never arrives
+KEEP_ON_TOP_INTERVAL_MS = 30000  # fallback only, when neither topmost hook can be installed
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
 # -----------------------
 # Utilities
 # -----------------------
+@functools.lru_cache(maxsize=None)
 def appdata_config_path() -> Path:
     """Return path to config file (Windows-only)."""
     appdata = os.getenv("APPDATA") or str(Path.home() / "AppData" / "Roaming")
@@ -96,14 +181,21 @@ def appdata_config_path() -> Path:
     return config_dir / "config.json"
 
 
+# Parsed config.json, kept after the first read; only this module writes the file
+_config_cache: Optional[dict] = None
+
+
 def load_config() -> dict:
-    """Load configuration from file."""
+    """Load configuration from file (read from disk once, then served from memory)."""
+    global _config_cache
+    if _config_cache is not None:
+        return dict(_config_cache)
     cfg = appdata_config_path()
     if not cfg.exists():
         return {}
     try:
-        data = json.loads(cfg.read_text(encoding="utf-8"))
-        return data
+        _config_cache = json.loads(cfg.read_text(encoding="utf-8"))
+        return dict(_config_cache)
     except Exception as ex:
         logging.exception("Failed to read config file")
         print(f"ERROR: Failed to read config file: {ex}", flush=True)
@@ -112,9 +204,11 @@ def load_config() -> dict:
 
 def save_config(config: dict) -> bool:
     """Save configuration to file."""
+    global _config_cache
     cfg = appdata_config_path()
     try:
         cfg.write_text(json.dumps(config, indent=2), encoding="utf-8")
+        _config_cache = dict(config)
         return True
     except Exception as ex:
         logging.exception("Failed to save config")
@@ -145,6 +239,22 @@ def load_model_name() -> str:
     return model
 
 
+def load_detection_model() -> str:
+    """Load the question type detection model from config file, or return default."""
+    model = load_config().get("detection_model", DETECTION_MODEL)
+    if model not in AVAILABLE_MODELS:
+        return DETECTION_MODEL
+    return model
+
+
+def load_jpeg_quality() -> int:
+    """Load JPEG quality from config file, or return default."""
+    quality = load_config().get("jpeg_quality", JPEG_QUALITY)
+    if not isinstance(quality, int) or not 1 <= quality <= 95:
+        return JPEG_QUALITY
+    return quality
+
+
 def save_model_name(model_name: str) -> bool:
     """Save model name to config file."""
     if model_name not in AVAILABLE_MODELS:
@@ -154,11 +264,106 @@ def save_model_name(model_name: str) -> bool:
     return save_config(data)
 
 
+@functools.lru_cache(maxsize=None)
+def get_fast_jpeg_encoder():
+    """Return encode(bgrx_pixels, quality) -> bytes backed by libjpeg-turbo, or None to use PIL.
+
+    simplejpeg is preferred because its wheels bundle libjpeg-turbo; PyTurboJPEG needs the library installed.
+    Both encode 4:2:0, which is visually lossless for near-monochrome quiz text and shrinks the payload.
+    """
+    try:
+        import simplejpeg
+
+        def encode(pixels, quality: int) -> bytes:
+            return simplejpeg.encode_jpeg(pixels, quality=quality, colorspace="BGRX", colorsubsampling="420")
+
+        return encode
+    except Exception as ex:
+        print(f"DEBUG: simplejpeg unavailable: {ex}", flush=True)
+    try:
+        from turbojpeg import TJPF_BGRX, TJSAMP_420, TurboJPEG
+        turbo = TurboJPEG()
+
+        def encode(pixels, quality: int) -> bytes:
+            return turbo.encode(pixels, quality=quality, pixel_format=TJPF_BGRX, jpeg_subsample=TJSAMP_420)
+
+        return encode
+    except Exception as ex:
+        print(f"DEBUG: TurboJPEG unavailable, using PIL for JPEG encoding: {ex}", flush=True)
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_tesserocr():
+    """Return the tesserocr module, or None when local OCR isn't installed."""
+    try:
+        import tesserocr
+        return tesserocr
+    except Exception as ex:
+        print(f"DEBUG: tesserocr unavailable, skipping the no-text check: {ex}", flush=True)
+        return None
+
+
+def response_cache_path() -> Path:
+    """Return path to the response cache file (next to config.json)."""
+    return appdata_config_path().parent / "response_cache.json"
+
+
+def shot_to_grayscale(shot):
+    """Return a grabbed region as an "L" image for OCR, with standard luma weights."""
+    from PIL import Image
+    # Unpack BGRX to real RGB first: reading the buffer as RGBX would swap the red and blue weights,
+    # making red text darker and blue text lighter than it really is
+    return Image.frombuffer("RGB", shot.size, shot.raw, "raw", "BGRX", 0, 1).convert("L")
+
+
+def response_cache_key(image_bytes, model_name: str, detection_model: str, multiplier: int) -> str:
+    """Return cache key for a screenshot classified and answered with the given models and multiplier."""
+    # An exact digest: a perceptual hash can't tell apart questions that differ in a single character
+    digest = hashlib.sha256()
+    digest.update(f"{QUESTION_TYPE_DETECTION_PROMPT}\0{model_name}\0{detection_model}\0{multiplier}\0".encode("utf-8"))
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+def vision_messages(kind: str, image_url: str) -> list:
+    """Return the chat messages for a prebuilt prompt part plus one screenshot."""
+    image_part = {"type": "image_url", "image_url": {"url": image_url, "detail": IMAGE_DETAIL}}
+    return [{"role": "user", "content": [PROMPT_PARTS[kind], image_part]}]
+
+
+def load_response_cache() -> "OrderedDict[str, dict]":
+    """Load cached responses (oldest first) from file."""
+    path = response_cache_path()
+    if not path.exists():
+        return OrderedDict()
+    try:
+        return OrderedDict(json.loads(path.read_text(encoding="utf-8")))
+    except Exception as ex:
+        logging.exception("Failed to read response cache")
+        print(f"ERROR: Failed to read response cache: {ex}", flush=True)
+        return OrderedDict()
+
+
+def save_response_cache(cache: "OrderedDict[str, dict]") -> bool:
+    """Save cached responses to file."""
+    path = response_cache_path()
+    try:
+        path.write_text(json.dumps(cache), encoding="utf-8")
+        return True
+    except Exception as ex:
+        logging.exception("Failed to save response cache")
+        print(f"ERROR: Failed to save response cache: {ex}", flush=True)
+        return False
+
+
 def delete_saved_api_key() -> bool:
+    global _config_cache
     cfg = appdata_config_path()
     try:
         if cfg.exists():
             cfg.unlink()
+        _config_cache = None
         return True
     except Exception as ex:
         logging.exception("Failed to delete config file")
@@ -166,8 +371,15 @@ def delete_saved_api_key() -> bool:
         return False
 
 
+# "sk-" plus at least 7 key characters; rejects stray whitespace and pasted junk in one C-level match
+_API_KEY_RE = re.compile(r"sk-[A-Za-z0-9_\-]{7,}")
+# A multiple-choice answer: single letters separated by whitespace, e.g. "a" or "b d"
+_CHOICE_LETTERS_RE = re.compile(r"[a-zA-Z](?:\s+[a-zA-Z])*")
+_TRUE_FALSE_ANSWERS = frozenset(("true", "false"))
+
+
 def looks_like_api_key(k: Optional[str]) -> bool:
-    return bool(k and k.startswith("sk-") and len(k) >= 10)
+    return bool(k and _API_KEY_RE.fullmatch(k))
 
 
 # -----------------------
@@ -175,26 +387,28 @@ def looks_like_api_key(k: Optional[str]) -> bool:
 # -----------------------
 def ensure_process_dpi_awareness() -> None:
     """Try to set process DPI awareness for better high-DPI behavior on Windows."""
-    if ctypes is None:
+    if _user32 is None:
         return
     try:
         # Windows 8.1+ API
         try:
-            shcore = ctypes.windll.shcore
             PROCESS_PER_MONITOR_DPI_AWARE = 2
-            shcore.SetProcessDpiAwareness(PROCESS_PER_MONITOR_DPI_AWARE)
+            _shcore.SetProcessDpiAwareness(PROCESS_PER_MONITOR_DPI_AWARE)
             logging.debug("SetProcessDpiAwareness called")
         except Exception:
             try:
-                ctypes.windll.user32.SetProcessDPIAware()
+                _user32.SetProcessDPIAware()
                 logging.debug("SetProcessDPIAware fallback called")
             except Exception:
                 pass
 
-        # newer API
+        # newer API; the context is a pseudo-handle, so it must be passed pointer-width
         try:
             DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
-            ctypes.windll.user32.SetProcessDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2)
+            set_context = _user32.SetProcessDpiAwarenessContext
+            set_context.argtypes = (wintypes.HANDLE,)
+            set_context.restype = wintypes.BOOL
+            set_context(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2)
             logging.debug("SetProcessDpiAwarenessContext called")
         except Exception:
             pass
@@ -203,6 +417,7 @@ def ensure_process_dpi_awareness() -> None:
         print(f"ERROR: Failed to set process DPI awareness: {ex}", flush=True)
 
 
+@functools.lru_cache(maxsize=None)
 def get_system_scale_factor(hwnd: Optional[int] = None) -> float:
     """Return DPI scale factor (1.0 = 100%, 1.25 = 125%, etc)."""
     # On Windows, this would need proper DPI detection
@@ -215,9 +430,10 @@ def get_system_scale_factor(hwnd: Optional[int] = None) -> float:
 class InvisibleScreenshotSelector:
     """A nearly-invisible fullscreen Tk window that lets the user click-drag to select an area."""
 
-    def __init__(self, master: tk.Tk, on_complete):
+    def __init__(self, master: tk.Tk, on_complete, scale_factor: float = 1.0):
         """
         on_complete: callback(final_coords: Tuple[int,int,int,int]) where coords are physical pixels
+        scale_factor: DPI scale used to convert logical coordinates to physical pixels
         """
         self._master = master
         self._on_complete = on_complete
@@ -243,13 +459,8 @@ class InvisibleScreenshotSelector:
         # Focus the window so it can receive keyboard events
         self._win.focus_force()
 
-        # Determine DPI scale for this window
-        self._hwnd = None
-        try:
-            self._hwnd = self._win.winfo_id()
-        except Exception:
-            pass
-        self.scale_factor = get_system_scale_factor(self._hwnd)
+        # DPI scale is computed once by the app and passed in
+        self.scale_factor = scale_factor
 
         # Canvas to catch mouse events
         self._canvas = tk.Canvas(self._win, highlightthickness=0, bg="black")
@@ -259,9 +470,9 @@ class InvisibleScreenshotSelector:
 
         self._start = None
         self._final_coords = None
+        self._fallback_id = None
 
         self._canvas.bind("<ButtonPress-1>", self._on_press)
-        self._canvas.bind("<B1-Motion>", self._on_drag)
         self._canvas.bind("<ButtonRelease-1>", self._on_release)
         # Bind escape key to both window and canvas
         self._win.bind("<Escape>", self._cancel)
@@ -273,16 +484,12 @@ class InvisibleScreenshotSelector:
         # Hide from taskbar again after window is fully shown
         self._master.after(10, self._hide_from_taskbar)
 
-        # make sure selector stays on top
-        self._keep_on_top()
+        # make sure selector is on top (once; -topmost keeps it there)
+        self._bring_to_top()
 
     def _on_press(self, event):
         self._start = (event.x_root, event.y_root)
 
-    def _on_drag(self, event):
-        # optional: draw rectangle preview (omitted intentionally to keep near-invisible)
-        pass
-
     def _on_release(self, event):
         if not self._start:
             self._cancel()
@@ -302,13 +509,23 @@ class InvisibleScreenshotSelector:
         y2p = int(round(max(y1, y2) * self.scale_factor))
 
         self._final_coords = (x1p, y1p, x2p, y2p)
+        # grab as soon as Tk reports the overlay unmapped; the timer only covers a missing <Unmap>
+        self._win.bind("<Unmap>", self._on_unmap)
+        self._fallback_id = self._master.after(SELECTOR_HIDE_FALLBACK_MS, self._complete)
         self._win.withdraw()
-        # give a small delay so the window is not in the screenshot
-        self._master.after(150, lambda: self._complete())
+
+    def _on_unmap(self, event):
+        # child widgets report through the toplevel's bindtags too; only the window itself counts
+        if event.widget is self._win:
+            self._complete()
 
     def _complete(self):
-        if self._final_coords:
-            self._on_complete(self._final_coords)
+        if self._fallback_id is not None:
+            self._master.after_cancel(self._fallback_id)
+            self._fallback_id = None
+        coords, self._final_coords = self._final_coords, None
+        if coords:
+            self._on_complete(coords)
         self._destroy()
 
     def _cancel(self, event=None):
@@ -356,7 +573,7 @@ class InvisibleScreenshotSelector:
                 logging.exception("Failed to hide selector from taskbar")
                 print(f"ERROR: Failed to hide selector from taskbar: {ex}", flush=True)
 
-    def _keep_on_top(self):
+    def _bring_to_top(self):
         try:
             if not self._win.winfo_exists():
                 return
@@ -376,7 +593,6 @@ class InvisibleScreenshotSelector:
                     )
                 except Exception:
                     pass
-            self._win.after(50, self._keep_on_top)
         except Exception:
             pass
 
@@ -385,21 +601,56 @@ class InvisibleScreenshotSelector:
 # Main application UI + logic
 # -----------------------
 class ScreenshotApp:
+    # Fixed attribute layout: state flags are checked on every click, and typos fail loudly
+    __slots__ = (
+        "username", "screenshot_bytes", "screenshot_data_url", "screenshot_loaded", "response_text", "response_shown",
+        "sending", "selecting_area", "multiplier", "model_name", "_response_cache",
+        "root", "transparent_color", "hw", "_scale", "_screen_size", "_dialog_parent",
+        "_button_frame", "_status_label", "_buttons_container", "_btn_multiplier", "_btn_screenshot",
+        "_btn_send", "_btn_settings", "_btn_reset", "_btn_quit", "client", "_sct", "loop",
+        "batch_mode", "_batch_requests", "_btn_batch",
+        "_pending_status", "_status_flush_scheduled", "_status_geometry",
+        "_old_wndproc", "_win_event_proc", "_win_event_hook", "screenshot_has_text", "_capture_id", "jpeg_quality",
+        "_multiplier_cycle",
+        "detection_model",
+    )
+
+    # Win32 names used by the window proc (every toolbar message) and _raise_topmost, bound once at class scope
+    if win32gui and win32con:
+        _CallWindowProc = staticmethod(win32gui.CallWindowProc)
+        _SetWindowPos = staticmethod(win32gui.SetWindowPos)
+        _WM_WINDOWPOSCHANGING = win32con.WM_WINDOWPOSCHANGING
+        _WM_DISPLAYCHANGE = win32con.WM_DISPLAYCHANGE
+        _SWP_NOZORDER = win32con.SWP_NOZORDER
+        _HWND_TOPMOST = win32con.HWND_TOPMOST
+        _TOPMOST_FLAGS = win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE
+
     def __init__(self):
         ensure_process_dpi_awareness()
-        self.temp_path = Path(os.getenv("TEMP", str(Path.home() / "AppData" / "Local" / "Temp"))) / TEMP_SCREENSHOT_NAME
-        self.username = getpass.getuser()
-        self.state = {
-            "screenshot_path": None,
-            "screenshot_loaded": False,
-            "response_text": None,
-            "response_shown": False,
-            "sending": False,
-            "selecting_area": False,
-            "multiplier": 1,  # 1x, 2x, 3x, or 4x
-        }
+        self.username = os.environ.get("USERNAME") or os.getlogin()
+        self.screenshot_bytes: Optional[ImageBuffer] = None
+        self.screenshot_data_url: Optional[str] = None  # base64 data URL, built on the encode thread
+        self.screenshot_loaded = False
+        self.response_text: Optional[str] = None
+        self.response_shown = False
+        self.sending = False
+        self.selecting_area = False
+        self.screenshot_has_text: Optional[bool] = None  # None until (or unless) local OCR has run
+        self._capture_id = 0  # lets late encode/OCR results for an older capture be ignored
+        self._multiplier_cycle = itertools.cycle(MULTIPLIER_OPTIONS)
+        self.multiplier, _ = next(self._multiplier_cycle)  # 1x, 2x, 3x, or 4x
+        # Latest status text/flag and whether a Tk-side flush is already queued for it
+        self._pending_status: Tuple[str, bool] = ("Ready", False)
+        self._status_flush_scheduled = False
+        self._status_geometry: Optional[str] = None
+        self.batch_mode = False
+        self._batch_requests: list[dict] = []  # JSONL request lines waiting for the next batch
         # Load saved model name
         self.model_name = load_model_name()
+        self.detection_model = load_detection_model()
+        self.jpeg_quality = load_jpeg_quality()
+        # Answers to previously sent screenshots, most recently used last
+        self._response_cache = load_response_cache()
         print(f"DEBUG: Loaded model on startup: {self.model_name}", flush=True)
         # Tk root
         self.root = tk.Tk()
@@ -411,6 +662,13 @@ class ScreenshotApp:
         # small toolbar in top-left - minimal size (2 rows: status + buttons)
         self.root.geometry("200x50+5+5")
         self.hw = self.root.winfo_id()
+        # DPI scale and screen size are constant for the session; look them up once
+        self._scale = get_system_scale_factor(self.hw)
+        self._screen_size = self._query_screen_size()
+
+        # Hidden parent for dialogs, reused instead of creating a throwaway Tk interpreter per dialog
+        self._dialog_parent = tk.Toplevel(self.root)
+        self._dialog_parent.withdraw()
 
         # Create a frame for buttons with transparent background
         self._button_frame = tk.Frame(self.root, bg=self.transparent_color, height=50)
@@ -457,12 +715,21 @@ class ScreenshotApp:
         # Multiplier button - cycles through 1x, 2x, 3x, 4x
         self._btn_multiplier = tk.Button(
             buttons_container,
-            text="1x",
+            text=MULTIPLIER_OPTIONS[0][1],
             command=self._cycle_multiplier,
             **button_style,
         )
         self._btn_multiplier.pack(side="left", padx=1)
 
+        # Batch toggle - while on, sends are queued; turning it off submits the queue as one batch
+        self._btn_batch = tk.Button(
+            buttons_container,
+            text="B",
+            command=self._toggle_batch_mode,
+            **button_style,
+        )
+        self._btn_batch.pack(side="left", padx=1)
+
         self._btn_screenshot = tk.Button(
             buttons_container,
             text="📷",
@@ -513,6 +780,12 @@ class ScreenshotApp:
 
         # OpenAI client will be created after providing API key
         self.client = None
+        # One persistent event loop runs every OpenAI request, off the Tk thread
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+        # Screen grabber; allocates its device contexts once and is reused for every capture
+        self._sct = mss.mss()
 
         # Initial status
         self._update_status("Ready")
@@ -551,130 +824,195 @@ class ScreenshotApp:
             except Exception as ex:
                 logging.exception("Failed to set extended window styles for toolbar")
                 print(f"ERROR: Failed to set extended window styles for toolbar: {ex}", flush=True)
-        # Ensure it stays topmost occasionally
-        self.root.after(2000, self._keep_always_on_top)
+        # Keep it topmost: veto z-order changes in the window proc and re-raise when another app takes the
+        # foreground; only if neither hook can be installed, re-assert occasionally on a timer
+        hooked = self._install_topmost_hook()
+        hooked = self._install_foreground_hook() or hooked
+        if not hooked:
+            self.root.after(KEEP_ON_TOP_INTERVAL_MS, self._keep_always_on_top)
+
+    def _install_topmost_hook(self) -> bool:
+        """Subclass the toolbar's frame window so every z-order change keeps it HWND_TOPMOST."""
+        self._old_wndproc = None
+        if not (win32gui and win32con and _user32):
+            return False
+        try:
+            frame = int(self.root.wm_frame(), 16)
+            self._old_wndproc = win32gui.SetWindowLong(frame, win32con.GWL_WNDPROC, self._toolbar_wndproc)
+            return True
+        except Exception as ex:
+            print(f"DEBUG: Could not install topmost hook, polling instead: {ex}", flush=True)
+            return False
+
+    def _install_foreground_hook(self) -> bool:
+        """Re-raise the toolbar whenever another process's window becomes the foreground window."""
+        self._win_event_proc = None
+        self._win_event_hook = None
+        if not (win32gui and win32con and _user32):
+            return False
+        try:
+            # keep a reference: the hook holds only a raw pointer to this callback
+            self._win_event_proc = WinEventProc(self._on_foreground_changed)
+            self._win_event_hook = _user32.SetWinEventHook(
+                EVENT_SYSTEM_FOREGROUND,
+                EVENT_SYSTEM_FOREGROUND,
+                None,
+                self._win_event_proc,
+                0,
+                0,
+                WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS,
+            )
+            return bool(self._win_event_hook)
+        except Exception as ex:
+            print(f"DEBUG: Could not install foreground hook: {ex}", flush=True)
+            return False
+
+    def _on_foreground_changed(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        self._raise_topmost()
+
+    def _toolbar_wndproc(self, hwnd, msg, wparam, lparam):
+        if msg == self._WM_WINDOWPOSCHANGING:
+            pos = WINDOWPOS.from_address(lparam)
+            if not pos.flags & self._SWP_NOZORDER:
+                pos.hwndInsertAfter = self._HWND_TOPMOST
+        elif msg == self._WM_DISPLAYCHANGE:
+            # The clamp in _on_selection_complete uses the cached size; refresh it when monitors change
+            self.root.after_idle(self._refresh_screen_size)
+        return self._CallWindowProc(self._old_wndproc, hwnd, msg, wparam, lparam)
 
     def _keep_always_on_top(self):
+        self._raise_topmost()
+        self.root.after(KEEP_ON_TOP_INTERVAL_MS, self._keep_always_on_top)
+
+    def _raise_topmost(self):
         try:
             if win32gui and win32con:
-                win32gui.SetWindowPos(
-                    self.hw,
-                    win32con.HWND_TOPMOST,
-                    0,
-                    0,
-                    0,
-                    0,
-                    win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE,
-                )
+                self._SetWindowPos(self.hw, self._HWND_TOPMOST, 0, 0, 0, 0, self._TOPMOST_FLAGS)
         except Exception:
             pass
-        self.root.after(2000, self._keep_always_on_top)
 
     def _update_status(self, text: str, is_response: bool = False):
-        """Update the status label text."""
+        """Update the status label text. Safe from any thread; bursts collapse into one redraw."""
         print(f"DEBUG: _update_status called with text='{text}', is_response={is_response}", flush=True)
-        def do_update():
-            print(f"DEBUG: do_update executing, is_response={is_response}, text='{text}', text bool: {bool(text)}", flush=True)
-            if is_response and text:
-                # Calculate width needed (no need to account for buttons, they're on separate line)
-                text_width = min(max(len(text) * 6 + 20, 200), 600)  # Min 200px, max 600px
-                # Don't use wraplength - keep text on single line to prevent vertical expansion
-                # Update label with text and font BEFORE changing geometry
-                self._status_label.config(
-                    text=text, 
-                    font=("Arial", 10), 
-                    fg="#2a2a2a",
-                    wraplength=0,  # No wrapping - single line only
-                    anchor="w",
-                    justify="left",
-                    height=1  # Fixed height - single line
-                )
-                # Force label update
-                self._status_label.update_idletasks()
-                # Then expand window to fit more text (buttons are on separate line, so no constraint)
-                # Height is 50px for two rows (status + buttons)
-                self.root.geometry(f"{text_width}x50+5+5")
-                # Ensure the button frame doesn't expand vertically
-                self._button_frame.config(height=50)
-                # Force window update to ensure text is visible and buttons stay in place
-                self.root.update_idletasks()
-            else:
-                # Normal status with smaller font - no truncation needed since buttons are on separate line
-                self._status_label.config(
-                    text=text if text else "Ready", 
-                    font=("Arial", 7), 
-                    fg="#2a2a2a",
-                    wraplength=0,  # No wrapping for short text
-                    anchor="w"
-                )
-                # Reset to default size (50px height for two rows)
-                self.root.geometry("200x50+5+5")
-                self.root.update_idletasks()
-            # Update button states - allow screenshot button even after response is shown
-            self._btn_send.config(state="normal" if self.state["screenshot_loaded"] and not self.state["sending"] else "disabled")
-            self._btn_screenshot.config(state="normal" if not self.state["selecting_area"] and not self.state["sending"] else "disabled")
-        self.root.after(0, do_update)
+        self._pending_status = (text, is_response)
+        if not self._status_flush_scheduled:
+            self._status_flush_scheduled = True
+            self.root.after(0, self._flush_status)
+
+    def _flush_status(self):
+        """Apply the latest pending status on the Tk thread with a single label config and geometry change."""
+        # clear the flag before reading, so a status posted meanwhile schedules another flush
+        self._status_flush_scheduled = False
+        text, is_response = self._pending_status
+        print(f"DEBUG: _flush_status executing, is_response={is_response}, text='{text}'", flush=True)
+        if is_response and text:
+            # Single line, wider window for answers (buttons are on a separate row, so no constraint)
+            text_width = min(max(len(text) * 6 + 20, 200), 600)  # Min 200px, max 600px
+            # fg, anchor, single-line height and no wrapping are fixed at creation; only text and font change
+            self._status_label.config(text=text, font=("Arial", 10))
+            geometry = f"{text_width}x50+5+5"
+        else:
+            # Normal status with smaller font in the default 200x50 toolbar
+            self._status_label.config(text=text if text else "Ready", font=("Arial", 7))
+            geometry = "200x50+5+5"
+        # Only touch the window manager when the size actually changed; Tk lays out on the next idle pass
+        if geometry != self._status_geometry:
+            self._status_geometry = geometry
+            self.root.geometry(geometry)
+        # Update button states - allow screenshot button even after response is shown
+        self._btn_send.config(state="normal" if self.screenshot_loaded and not self.sending else "disabled")
+        self._btn_screenshot.config(state="normal" if not self.selecting_area and not self.sending else "disabled")
+
+    def _refresh_screen_size(self):
+        self._screen_size = self._query_screen_size()
+        print(f"DEBUG: Display changed, screen size now {self._screen_size}", flush=True)
+
+    def _query_screen_size(self) -> Optional[Tuple[int, int]]:
+        """Return the screen size in physical pixels, or None if it can't be determined."""
+        if win32api:
+            # GetSystemMetrics doesn't raise; it reports failure as 0
+            sw_logical = win32api.GetSystemMetrics(0)
+            sh_logical = win32api.GetSystemMetrics(1)
+            if not (sw_logical and sh_logical):
+                return None
+            return int(round(sw_logical * self._scale)), int(round(sh_logical * self._scale))
+        try:
+            return self.root.winfo_screenwidth(), self.root.winfo_screenheight()
+        except tk.TclError:
+            return None
 
     # ---------- API key handling ----------
     def ensure_client(self) -> bool:
         """Ensure we have a valid OpenAI client. Shows dialogs when needed."""
+        if self.client is not None:
+            return True
         api_key = load_api_key()
         if not looks_like_api_key(api_key):
-            # prompt user for key via a simple hidden Tk root
-            tmp = tk.Tk()
-            tmp.withdraw()
+            # prompt user for key, parented to the shared hidden dialog window
             while True:
                 api_key = simpledialog.askstring(
                     "OpenAI API Key Required",
                     "Enter your OpenAI API key (starts with sk-...):",
                     show="*",
-                    parent=tmp,
+                    parent=self._dialog_parent,
                 )
                 if api_key is None:
-                    messagebox.showerror("Error", "API key is required to use this application.", parent=tmp)
-                    tmp.destroy()
+                    messagebox.showerror("Error", "API key is required to use this application.", parent=self._dialog_parent)
                     return False
+                # a paste often drags a trailing newline or space along
+                api_key = api_key.strip()
                 if looks_like_api_key(api_key):
                     if not save_api_key(api_key):
-                        messagebox.showwarning("Warning", "Failed to save API key locally.", parent=tmp)
+                        messagebox.showwarning("Warning", "Failed to save API key locally.", parent=self._dialog_parent)
                     break
                 else:
-                    messagebox.showerror("Invalid API Key", "API key must start with 'sk-' and be valid. Please try again.", parent=tmp)
-            tmp.destroy()
+                    messagebox.showerror("Invalid API Key", "API key must start with 'sk-' and be valid. Please try again.", parent=self._dialog_parent)
 
         # create client
-        if OpenAI is None:
+        # imported here rather than at module load: openai adds a few hundred ms to startup
+        try:
+            import httpx
+            from openai import AsyncOpenAI
+        except Exception:
             messagebox.showerror("Missing dependency", "OpenAI Python client not available. Install `openai` or the official client.", parent=self.root)
             return False
         try:
-            self.client = OpenAI(api_key=api_key)
-            return True
+            # keep-alive HTTP/2 pool shared by every request, so sends reuse one TLS connection
+            http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=HTTP_MAX_KEEPALIVE, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+            )
+            self.client = AsyncOpenAI(api_key=api_key, http_client=http_client)
         except Exception as ex:
             logging.exception("Failed to create OpenAI client")
             print(f"ERROR: Failed to create OpenAI client: {ex}", flush=True)
             messagebox.showerror("OpenAI Error", "Failed to create OpenAI client. Check API key.", parent=self.root)
             return False
+        # open the pooled TLS connection now so the first send doesn't pay for the handshake
+        asyncio.run_coroutine_threadsafe(self._warm_up_client(self.client), self.loop)
+        return True
+
+    async def _warm_up_client(self, client):
+        """Issue a cheap request so the underlying httpx pool holds an open connection."""
+        try:
+            await client.models.list()
+        except Exception as ex:
+            print(f"DEBUG: Connection warm-up failed: {ex}", flush=True)
 
     def reset_api_key(self):
         """Reset (delete) saved API key and exit so user can restart."""
-        if self.state["sending"] or self.state["selecting_area"]:
+        if self.sending or self.selecting_area:
             return
-        tmp = tk.Tk()
-        tmp.withdraw()
-        if messagebox.askyesno("Reset API Key", "Do you want to reset the saved API key? The application will close and you'll need to restart it.", parent=tmp):
+        if messagebox.askyesno("Reset API Key", "Do you want to reset the saved API key? The application will close and you'll need to restart it.", parent=self._dialog_parent):
             if delete_saved_api_key():
-                messagebox.showinfo("Success", "API key reset. The application will now close.", parent=tmp)
-                tmp.destroy()
+                messagebox.showinfo("Success", "API key reset. The application will now close.", parent=self._dialog_parent)
                 self._cleanup_and_quit()
             else:
-                messagebox.showerror("Error", "Failed to reset API key.", parent=tmp)
-                tmp.destroy()
-        else:
-            tmp.destroy()
+                messagebox.showerror("Error", "Failed to reset API key.", parent=self._dialog_parent)
 
     def open_settings(self):
         """Open settings dialog."""
-        if self.state["sending"] or self.state["selecting_area"]:
+        if self.sending or self.selecting_area:
             return
         
         # Create settings window
@@ -722,40 +1060,119 @@ class ScreenshotApp:
     # ---------- Multiplier handling ----------
     def _cycle_multiplier(self):
         """Cycle through multiplier options: 1x -> 2x -> 3x -> 4x -> 1x"""
-        self.state["multiplier"] = (self.state["multiplier"] % 4) + 1
-        self._btn_multiplier.config(text=f"{self.state['multiplier']}x")
-        print(f"DEBUG: Multiplier changed to {self.state['multiplier']}x", flush=True)
+        self.multiplier, label = next(self._multiplier_cycle)
+        self._btn_multiplier.config(text=label)
+        print(f"DEBUG: Multiplier changed to {label}", flush=True)
+
+    # ---------- Batch mode ----------
+    def _toggle_batch_mode(self):
+        """Turn batch mode on, or turn it off and submit everything queued so far."""
+        if self.sending or self.selecting_area:
+            return
+        if not self.batch_mode:
+            self.batch_mode = True
+            self._btn_batch.config(text="B0")
+            self._update_status("Batch: queue with ➤")
+            return
+
+        # Stay in batch mode with the queue intact until the job can actually be submitted
+        if self._batch_requests and not self.ensure_client():
+            return
+        self.batch_mode = False
+        self._btn_batch.config(text="B")
+        requests, self._batch_requests = self._batch_requests, []
+        if not requests:
+            self._update_status("Ready")
+            return
+        asyncio.run_coroutine_threadsafe(self._run_batch(requests), self.loop)
+
+    def _queue_batch_request(self):
+        """Add the current screenshot to the pending batch as a chat completions request line."""
+        image_url = self.screenshot_data_url
+        # Batch jobs can't chain the question type detection, so use its fallback prompt
+        self._batch_requests.append(
+            {
+                "custom_id": f"q{len(self._batch_requests) + 1}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "messages": vision_messages("multiple_choice", image_url),
+                },
+            }
+        )
+        count = len(self._batch_requests)
+        self._btn_batch.config(text=f"B{count}")
+        self.screenshot_bytes = None
+        self.screenshot_data_url = None
+        self.screenshot_loaded = False
+        self._update_status(f"Queued {count} for batch")
+
+    async def _run_batch(self, requests: list[dict]):
+        """Upload queued requests as a Batch API job, wait for it and show the answers."""
+        try:
+            payload = "\n".join(json.dumps(request) for request in requests).encode("utf-8")
+            batch_file = await self.client.files.create(file=("moodler_batch.jsonl", payload), purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=BATCH_COMPLETION_WINDOW,
+            )
+            print(f"DEBUG: Batch {batch.id} submitted with {len(requests)} requests", flush=True)
+            self._update_status(f"Batch submitted ({len(requests)})")
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                batch = await self.client.batches.retrieve(batch.id)
+                print(f"DEBUG: Batch {batch.id} status: {batch.status}", flush=True)
+            if batch.status != "completed" or not batch.output_file_id:
+                self._update_status(f"Batch {batch.status}")
+                return
+
+            output = await self.client.files.content(batch.output_file_id)
+            answers = {}
+            for line in output.text.splitlines():
+                record = json.loads(line)
+                try:
+                    content = record["response"]["body"]["choices"][0]["message"]["content"]
+                    answers[record["custom_id"]] = str(content).strip()
+                except (KeyError, IndexError, TypeError):
+                    print(f"DEBUG: Batch request {record.get('custom_id')} failed: {record.get('error')}", flush=True)
+            result_text = " | ".join(
+                f"{i}: {answers.get(request['custom_id'], 'no answer')}" for i, request in enumerate(requests, 1)
+            )
+            if pyperclip:
+                try:
+                    pyperclip.copy(result_text)
+                except Exception as ex:
+                    print(f"DEBUG: Failed to copy to clipboard: {ex}", flush=True)
+            self._update_status(result_text, is_response=True)
+        except Exception as ex:
+            logging.exception("Batch request failed")
+            print(f"ERROR: Batch request failed: {ex}", flush=True)
+            self._update_status(f"Error: {str(ex)[:25]}")
 
     # ---------- Screenshot flow ----------
     def start_area_selection(self):
-        if self.state["selecting_area"] or self.state["sending"]:
+        if self.selecting_area or self.sending:
             return
         # Reset state if we have a result shown (allows new screenshot after getting answer)
-        if self.state["response_shown"]:
+        if self.response_shown:
             self._reset_state()
-        self.state["selecting_area"] = True
+        self.selecting_area = True
         self._update_status("Select area...")
         # create the selector after a short delay so UI updates
-        self.root.after(50, lambda: InvisibleScreenshotSelector(self.root, self._on_selection_complete))
+        self.root.after(50, lambda: InvisibleScreenshotSelector(self.root, self._on_selection_complete, self._scale))
 
     def _on_selection_complete(self, final_coords: Optional[Tuple[int, int, int, int]]):
-        self.state["selecting_area"] = False
+        self.selecting_area = False
         if not final_coords:
             self._update_status("Ready")
             return
         x1, y1, x2, y2 = final_coords
         # ensure clamping to screen size (best-effort)
-        try:
-            if win32api:
-                sw_logical = win32api.GetSystemMetrics(0)
-                sh_logical = win32api.GetSystemMetrics(1)
-                scale = get_system_scale_factor()
-                screen_w = int(round(sw_logical * scale))
-                screen_h = int(round(sh_logical * scale))
-            else:
-                screen_w = self.root.winfo_screenwidth()
-                screen_h = self.root.winfo_screenheight()
-        except Exception:
+        if self._screen_size:
+            screen_w, screen_h = self._screen_size
+        else:
             screen_w, screen_h = x2 + 10, y2 + 10
 
         # clamp coords
@@ -768,53 +1185,133 @@ class ScreenshotApp:
         if y2 <= y1:
             y2 = y1 + 10
 
-        # Take the screenshot (Pillow)
+        # A new capture supersedes any older one still encoding, even if this grab fails
+        self._capture_id += 1
+        # Take the screenshot (mss); Pillow only wraps the raw BGRA buffer for encoding
+        try:
+            shot = self._sct.grab({"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1})
+        except Exception as ex:
+            self._on_grab_failed(self._capture_id, ex)
+            return
+        # Image encoding is the slow part; keep it off the Tk thread so the UI stays responsive
+        self.screenshot_loaded = False
+        self.screenshot_has_text = None
+        self._update_status("Encoding...")
+        threading.Thread(target=self._encode_screenshot, args=(shot, self._capture_id), daemon=True).start()
+        # A local OCR pass runs alongside so misclicked, text-free captures never reach the API
+        threading.Thread(target=self._check_for_text, args=(shot, self._capture_id), daemon=True).start()
+
+    def _encode_screenshot(self, shot, capture_id: int):
+        """Encode a grabbed region in a background thread and hand the bytes back to Tk."""
+        try:
+            encode_jpeg = None if SEND_PNG else get_fast_jpeg_encoder()
+            if encode_jpeg is not None and max(shot.size) <= MAX_IMAGE_EDGE:
+                # libjpeg-turbo reads the BGRX frame in place: no PIL image and no channel swizzle
+                import numpy as np
+                pixels = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+                image_bytes = encode_jpeg(pixels, self.jpeg_quality)
+            else:
+                image_bytes = self._encode_with_pil(shot)
+            # Build the data URL here too, so sending doesn't pay for base64 on the critical path;
+            # it is built as bytes and decoded once since base64 output is pure ASCII
+            image_url = (IMAGE_DATA_URL_PREFIX + base64.b64encode(image_bytes)).decode("ascii")
+        except Exception as ex:
+            self.root.after(0, self._on_grab_failed, capture_id, ex)
+            return
+        self.root.after(0, self._finish_grab, capture_id, image_bytes, image_url, shot.width, shot.height)
+
+    def _encode_with_pil(self, shot) -> ImageBuffer:
+        """Downscale and encode a grabbed region with Pillow."""
+        # PIL is first needed here, on the encode thread, so keep it off the startup path
+        from PIL import Image
+        # shot.raw wraps mss's buffer directly; shot.bgra would copy the whole frame again
+        im = Image.frombuffer("RGB", shot.size, shot.raw, "raw", "BGRX", 0, 1)
+        im.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.BILINEAR)
+        buf = io.BytesIO()
+        if SEND_PNG:
+            # skip deflate on small captures; it costs more than it saves there
+            small = im.width * im.height < SMALL_IMAGE_PIXELS
+            im.save(buf, format="PNG", compress_level=0 if small else PNG_COMPRESS_LEVEL)
+        else:
+            # subsampling=2 is 4:2:0; no optimize/progressive pass keeps it a single fast encode
+            im.save(buf, format="JPEG", quality=self.jpeg_quality, subsampling=2, optimize=False, progressive=False)
+        # a view of the encoder's buffer; getvalue() would copy the whole image again.
+        # buf must not be written to (or resized) again while the view is held: nothing else references it
+        return buf.getbuffer()
+
+    def _finish_grab(self, capture_id: int, image_bytes: ImageBuffer, image_url: str, width: int, height: int):
+        # an older capture that finished encoding late must not replace the current one
+        if capture_id != self._capture_id:
+            return
+        self.screenshot_bytes = image_bytes
+        self.screenshot_data_url = image_url
+        self.screenshot_loaded = True
+        self._update_status(f"Ready ({width}x{height})")
+
+    def _check_for_text(self, shot, capture_id: int):
+        """Run local OCR on a grabbed region and report whether it contains any letters or digits."""
+        # the first call imports tesserocr, so it happens here rather than in the Tk capture handler
+        tesserocr = get_tesserocr()
+        if tesserocr is None:
+            return
         try:
-            im = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-            im.save(self.temp_path)
-            self.state["screenshot_path"] = str(self.temp_path)
-            self.state["screenshot_loaded"] = True
-            width, height = abs(x2 - x1), abs(y2 - y1)
-            self._update_status(f"Ready ({width}x{height})")
+            im = shot_to_grayscale(shot)
+            text = tesserocr.image_to_text(im)
         except Exception as ex:
-            logging.exception("Screenshot failed")
-            print(f"ERROR: Screenshot failed: {ex}", flush=True)
-            self.state["screenshot_loaded"] = False
-            self._update_status(f"Error: {str(ex)[:20]}")
+            print(f"DEBUG: OCR check failed: {ex}", flush=True)
+            return
+        has_text = any(ch.isalnum() for ch in text)
+        print(f"DEBUG: OCR found text: {has_text}", flush=True)
+        self.root.after(0, self._set_has_text, capture_id, has_text)
+
+    def _set_has_text(self, capture_id: int, has_text: bool):
+        if capture_id == self._capture_id:
+            self.screenshot_has_text = has_text
+
+    def _on_grab_failed(self, capture_id: int, ex: Exception):
+        if capture_id != self._capture_id:
+            return
+        logging.exception("Screenshot failed", exc_info=ex)
+        print(f"ERROR: Screenshot failed: {ex}", flush=True)
+        self.screenshot_loaded = False
+        self._update_status(f"Error: {str(ex)[:20]}")
 
     # ---------- OpenAI sending ----------
     def send_current_screenshot(self):
-        if self.state["sending"] or self.state["selecting_area"]:
+        if self.sending or self.selecting_area:
             return
-        if not self.state["screenshot_loaded"] or not self.state.get("screenshot_path"):
+        if not self.screenshot_loaded or not self.screenshot_bytes:
             self._update_status("No screenshot")
             return
+        if self.screenshot_has_text is False:
+            self._update_status("No text detected")
+            return
+        if self.batch_mode:
+            self._queue_batch_request()
+            return
 
         if not self.ensure_client():
             return
 
-        # run the request in a background thread
-        thread = threading.Thread(target=self._send_to_openai_thread, daemon=True)
-        thread.start()
+        # Mark as sending here, on the Tk thread, so a second click can't slip in before the loop picks it up
+        self.sending = True
+        asyncio.run_coroutine_threadsafe(self._send_to_openai(), self.loop)
 
-    def _detect_question_type(self, b64: str) -> str:
+    def _output_token_limit(self, kind: str, model: Optional[str] = None) -> dict:
+        """Return the max_completion_tokens argument for a request kind, or nothing for reasoning models."""
+        limit = MAX_OUTPUT_TOKENS.get(kind)
+        if limit is None or (model or self.model_name).startswith(REASONING_MODEL_PREFIXES):
+            return {}
+        return {"max_completion_tokens": limit}
+
+    async def _detect_question_type(self, image_url: str) -> str:
         """Detect the type of question: multiple_choice, true_false, or open_ended."""
         try:
-            print(f"DEBUG: Detecting question type using model: {self.model_name}", flush=True)
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": QUESTION_TYPE_DETECTION_PROMPT},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{b64}"},
-                            },
-                        ],
-                    }
-                ],
+            print(f"DEBUG: Detecting question type using model: {self.detection_model}", flush=True)
+            response = await self.client.chat.completions.create(
+                model=self.detection_model,
+                messages=vision_messages("detection", image_url),
+                **self._output_token_limit("detection", self.detection_model),
             )
             content = response.choices[0].message.content
             if content:
@@ -840,68 +1337,101 @@ class ScreenshotApp:
             # Check if it's just letters (a-z) and spaces, max 30 chars
             if len(text_stripped) > 30:
                 return False
-            pattern = r'^[a-zA-Z](?:\s+[a-zA-Z])*$'
-            return bool(re.match(pattern, text_stripped))
+            return bool(_CHOICE_LETTERS_RE.fullmatch(text_stripped))
         elif question_type == "true_false":
             # Must be exactly "true" or "false" (case-insensitive)
-            return text_lower in ["true", "false"]
+            return text_lower in _TRUE_FALSE_ANSWERS
         elif question_type == "open_ended":
             # Open-ended answers can be longer, but should be reasonable (max 500 chars)
             return len(text_stripped) <= 500 and len(text_stripped) > 0
         return False
 
-    def _send_single_request(self, b64: str, question_type: str) -> Optional[str]:
-        """Send a single request to OpenAI and return the response text."""
+    async def _send_single_request(self, image_url: str, question_type: str, on_partial=None) -> Optional[str]:
+        """Send a single request to OpenAI and return the response text.
+
+        on_partial: optional callback(text_so_far); when given, the response is streamed
+        """
         try:
-            # Select appropriate prompt based on question type
-            if question_type == "multiple_choice":
-                prompt = PROMPT_MULTIPLE_CHOICE
-            elif question_type == "true_false":
-                prompt = PROMPT_TRUE_FALSE
-            elif question_type == "open_ended":
-                prompt = PROMPT_OPEN_ENDED
-            else:
-                prompt = PROMPT_MULTIPLE_CHOICE  # Default fallback
-            
+            # Select appropriate prompt based on question type (multiple choice is the fallback)
+            kind = question_type if question_type in PROMPT_PARTS else "multiple_choice"
+            messages = vision_messages(kind, image_url)
             print(f"DEBUG: Sending single request using model: {self.model_name} (question_type: {question_type})", flush=True)
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{b64}"},
-                            },
-                        ],
-                    }
-                ],
-            )
-            content = response.choices[0].message.content
-            if content is None:
-                return None
-            text = str(content).strip()
-            # Validate that it's a valid answer format
-            if not self._is_valid_answer(text, question_type):
-                print(f"DEBUG: Response is not a valid answer format for {question_type}: {repr(text)}", flush=True)
-                return "no answer"
-            # Normalize true/false to lowercase for consistency
-            if question_type == "true_false":
-                text = text.lower()
-            return text
+            if on_partial is None:
+                response = await self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    **self._output_token_limit(question_type),
+                )
+                content = response.choices[0].message.content
+            else:
+                content = await self._stream_completion(messages, on_partial, question_type)
+            return self._clean_answer(content, question_type)
         except Exception as ex:
             print(f"DEBUG: Single request failed: {ex}", flush=True)
             return None
 
-    def _compare_answers(self, answers: list[str], question_type: str) -> str:
+    async def _sample_answers(self, image_url: str, question_type: str, count: int) -> list[Optional[str]]:
+        """Ask for `count` independent answers in one request (n=count), so the image is uploaded once."""
+        try:
+            kind = question_type if question_type in PROMPT_PARTS else "multiple_choice"
+            print(f"DEBUG: Sampling {count} answers using model: {self.model_name} (question_type: {question_type})", flush=True)
+            response = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=vision_messages(kind, image_url),
+                n=count,
+                **self._output_token_limit(question_type),
+            )
+            return [self._clean_answer(choice.message.content, question_type) for choice in response.choices]
+        except Exception as ex:
+            print(f"DEBUG: Sampling request failed: {ex}", flush=True)
+            return []
+
+    def _clean_answer(self, content, question_type: str) -> Optional[str]:
+        """Strip and validate one completion; invalid formats become "no answer"."""
+        if content is None:
+            return None
+        text = str(content).strip()
+        # Validate that it's a valid answer format
+        if not self._is_valid_answer(text, question_type):
+            print(f"DEBUG: Response is not a valid answer format for {question_type}: {repr(text)}", flush=True)
+            return "no answer"
+        # Normalize true/false to lowercase for consistency
+        if question_type == "true_false":
+            text = text.lower()
+        return text
+
+    async def _stream_completion(self, messages: list, on_partial, question_type: str) -> Optional[str]:
+        """Stream a chat completion, reporting the text so far at most every STREAM_UPDATE_INTERVAL."""
+        chunks = []
+        last_update = 0.0
+        stream = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            stream=True,
+            **self._output_token_limit(question_type),
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            chunks.append(delta)
+            # Throttle partial updates so the Tk event queue isn't flooded
+            now = time.monotonic()
+            if now - last_update >= STREAM_UPDATE_INTERVAL:
+                last_update = now
+                on_partial("".join(chunks))
+        return "".join(chunks) if chunks else None
+
+    async def _compare_answers(self, answers: list[str], question_type: str) -> str:
         """Use LLM to compare multiple answers and determine the correct one."""
         if not answers:
             return "No answers to compare"
         
-        # If all answers are the same, return that answer
-        if len(set([a.lower() for a in answers])) == 1:
+        # If all answers are the same, return that answer (stops at the first mismatch)
+        first = answers[0].lower()
+        if all(a.lower() == first for a in answers[1:]):
             return answers[0]
         
         if question_type == "open_ended":
@@ -935,7 +1465,7 @@ class ScreenshotApp:
         
         try:
             print(f"DEBUG: Comparing answers using model: {self.model_name}", flush=True)
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {
@@ -943,6 +1473,7 @@ class ScreenshotApp:
                         "content": comparison_prompt,
                     }
                 ],
+                **self._output_token_limit(question_type),
             )
             content = response.choices[0].message.content
             if content is None:
@@ -958,86 +1489,121 @@ class ScreenshotApp:
             print(f"DEBUG: Comparison request failed: {ex}", flush=True)
             return answers[0]  # Fallback to first answer
 
-    def _send_to_openai_thread(self):
-        print("DEBUG: _send_to_openai_thread started", flush=True)
-        print(f"DEBUG: Using model: {self.model_name}", flush=True)
-        self.state["sending"] = True
-        multiplier = self.state["multiplier"]
-        self._update_status(f"Processing ({multiplier}x)...")
+    async def _answer_question(self, image_url: str, multiplier: int) -> Tuple[str, str]:
+        """Detect the question type and answer it. Returns (question_type, result_text)."""
+        question_type = None  # read by the partial-answer callbacks once detection has finished
+
+        def show_partial_for(kind):
+            def on_partial(text):
+                if kind == question_type:
+                    self._update_status(text, is_response=True)
+            return on_partial
+
+        # For a single request, answer every question type while detection runs instead of after it;
+        # the answers that don't match are cancelled, and only the matching one streams to the label
+        speculative = {}
+        if multiplier == 1:
+            for kind in SPECULATIVE_QUESTION_TYPES:
+                speculative[kind] = asyncio.create_task(
+                    self._send_single_request(image_url, kind, on_partial=show_partial_for(kind))
+                )
+
+        self._update_status("Detecting question type...")
         try:
-            print(f"DEBUG: Opening screenshot: {self.state['screenshot_path']}", flush=True)
-            with open(self.state["screenshot_path"], "rb") as f:
-                b64 = base64.b64encode(f.read()).decode("utf-8")
-            print(f"DEBUG: Image encoded, length: {len(b64)}", flush=True)
-            print(f"DEBUG: Multiplier: {multiplier}x", flush=True)
+            question_type = await self._detect_question_type(image_url)
+        finally:
+            answer_task = speculative.pop(question_type, None)
+            for task in speculative.values():
+                task.cancel()
+        print(f"DEBUG: Question type detected: {question_type}", flush=True)
+        
+        # Handle no_question and incomplete_question cases
+        if question_type == "no_question":
+            return question_type, "no question"
+        elif question_type == "incomplete_question":
+            return question_type, "no answer"
+        
+        if multiplier == 1:
+            # Single request - normal behavior
+            # Stream so the answer starts appearing at time-to-first-token
+            if answer_task is None:
+                answer_task = self._send_single_request(
+                    image_url, question_type, on_partial=show_partial_for(question_type)
+                )
+            result_text = await answer_task
+            if result_text is None:
+                result_text = "no answer"
+                print("DEBUG: Single request returned None", flush=True)
+            else:
+                print(f"DEBUG: Single request result: {repr(result_text)}", flush=True)
+        else:
+            # Multiple answers - sampled in one request, so the image is uploaded only once
+            answers = []
+            for i, answer in enumerate(await self._sample_answers(image_url, question_type, multiplier), 1):
+                if answer:
+                    answers.append(answer)
+                    print(f"DEBUG: Answer {i}/{multiplier}: {repr(answer)}", flush=True)
+                else:
+                    print(f"DEBUG: Answer {i}/{multiplier} was empty", flush=True)
             
-            # First, detect the question type
-            self._update_status("Detecting question type...")
-            question_type = self._detect_question_type(b64)
-            print(f"DEBUG: Question type detected: {question_type}", flush=True)
+            print(f"DEBUG: Received {len(answers)} answers: {answers}", flush=True)
             
-            # Handle no_question and incomplete_question cases
-            if question_type == "no_question":
-                result_text = "no question"
-                self.state["response_text"] = result_text
-                self.state["response_shown"] = True
-                self._update_status(result_text, is_response=True)
-                return
-            elif question_type == "incomplete_question":
-                result_text = "no answer"
-                self.state["response_text"] = result_text
-                self.state["response_shown"] = True
-                self._update_status(result_text, is_response=True)
-                return
+            # Filter out "no answer" responses
+            valid_answers = [a for a in answers if a != "no answer"]
             
-            if multiplier == 1:
-                # Single request - normal behavior
-                result_text = self._send_single_request(b64, question_type)
-                if result_text is None:
-                    result_text = "no answer"
-                    print("DEBUG: Single request returned None", flush=True)
-                else:
-                    print(f"DEBUG: Single request result: {repr(result_text)}", flush=True)
+            if not valid_answers:
+                result_text = "no answer"
+            elif len(valid_answers) == 1:
+                result_text = valid_answers[0]
             else:
-                # Multiple requests - send in parallel
-                print(f"DEBUG: Sending {multiplier} parallel requests", flush=True)
-                answers = []
-                with concurrent.futures.ThreadPoolExecutor(max_workers=multiplier) as executor:
-                    futures = [executor.submit(self._send_single_request, b64, question_type) for _ in range(multiplier)]
-                    for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-                        answer = future.result()
-                        if answer:
-                            answers.append(answer)
-                            print(f"DEBUG: Request {i}/{multiplier} completed: {repr(answer)}", flush=True)
-                        else:
-                            print(f"DEBUG: Request {i}/{multiplier} returned None", flush=True)
-                
-                print(f"DEBUG: Received {len(answers)} answers: {answers}", flush=True)
-                
-                # Filter out "no answer" responses
-                valid_answers = [a for a in answers if a != "no answer"]
-                
-                if not valid_answers:
-                    result_text = "no answer"
-                elif len(valid_answers) == 1:
+                # One case-insensitive count serves both checks ("A" and "a" are the same choice)
+                votes_by_answer = Counter(a.lower() for a in valid_answers)
+                # A strict majority of all samples settles it without the comparison round trip
+                majority_key, votes = votes_by_answer.most_common(1)[0]
+                if len(votes_by_answer) == 1:
+                    # All answers are the same, just use that answer
                     result_text = valid_answers[0]
+                    print(f"DEBUG: All answers are the same: {repr(result_text)}", flush=True)
+                elif votes > multiplier // 2:
+                    # report the winner as the model wrote it
+                    result_text = next(a for a in valid_answers if a.lower() == majority_key)
+                    print(f"DEBUG: Majority answer ({votes}/{multiplier}): {repr(result_text)}", flush=True)
                 else:
-                    # Check if all answers are the same (case-insensitive for true/false)
-                    if question_type == "true_false":
-                        unique_answers = set([a.lower() for a in valid_answers])
-                    else:
-                        unique_answers = set(valid_answers)
-                    
-                    if len(unique_answers) == 1:
-                        # All answers are the same, just use that answer
-                        result_text = valid_answers[0]
-                        print(f"DEBUG: All answers are the same: {repr(result_text)}", flush=True)
-                    else:
-                        # Answers differ, send to comparison LLM
-                        print(f"DEBUG: Answers differ ({unique_answers}), sending to comparison LLM", flush=True)
-                        result_text = self._compare_answers(valid_answers, question_type)
-                        print(f"DEBUG: Comparison result: {repr(result_text)}", flush=True)
-            
+                    # Answers differ, send to comparison LLM
+                    print(f"DEBUG: Answers differ ({set(votes_by_answer)}), sending to comparison LLM", flush=True)
+                    result_text = await self._compare_answers(valid_answers, question_type)
+                    print(f"DEBUG: Comparison result: {repr(result_text)}", flush=True)
+
+        return question_type, result_text
+
+    def _store_cached_response(self, cache_key: str, question_type: str, result_text: str):
+        """Remember a response, evicting the least recently used entries beyond the cap."""
+        self._response_cache[cache_key] = {"question_type": question_type, "result_text": result_text}
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+        save_response_cache(self._response_cache)
+
+    async def _send_to_openai(self):
+        print("DEBUG: _send_to_openai started", flush=True)
+        print(f"DEBUG: Using model: {self.model_name}", flush=True)
+        multiplier = self.multiplier
+        self._update_status(f"Processing ({multiplier}x)...")
+        try:
+            cache_key = response_cache_key(self.screenshot_bytes, self.model_name, self.detection_model, multiplier)
+            cached = self._response_cache.get(cache_key)
+            if cached:
+                self._response_cache.move_to_end(cache_key)
+                question_type, result_text = cached["question_type"], cached["result_text"]
+                print(f"DEBUG: Response cache hit: {repr(result_text)}", flush=True)
+            else:
+                image_url = self.screenshot_data_url
+                print(f"DEBUG: Image encoded, length: {len(image_url)}", flush=True)
+                print(f"DEBUG: Multiplier: {multiplier}x", flush=True)
+                question_type, result_text = await self._answer_question(image_url, multiplier)
+                if result_text != "no answer" and question_type != "no_question":
+                    self._store_cached_response(cache_key, question_type, result_text)
+
             # Handle open-ended questions specially
             if question_type == "open_ended" and result_text != "no answer":
                 # Copy to clipboard
@@ -1054,8 +1620,8 @@ class ScreenshotApp:
             else:
                 display_text = result_text
             
-            self.state["response_text"] = result_text
-            self.state["response_shown"] = True
+            self.response_text = result_text
+            self.response_shown = True
             print(f"DEBUG: Calling _update_status with text='{display_text}', is_response=True", flush=True)
             # Show result in status with larger font
             self._update_status(display_text, is_response=True)
@@ -1063,27 +1629,29 @@ class ScreenshotApp:
         except Exception as ex:
             logging.exception("OpenAI request failed")
             print(f"ERROR: OpenAI request failed: {ex}", flush=True)
-            self.state["response_text"] = None
-            self.state["response_shown"] = True
+            self.response_text = None
+            self.response_shown = True
             error_msg = str(ex)[:25]
             self._update_status(f"Error: {error_msg}")
         finally:
-            self.state["sending"] = False
+            self.sending = False
 
     def _reset_state(self):
         """Reset UI state after showing result."""
-        self.state.update(
-            {
-                "screenshot_path": None,
-                "screenshot_loaded": False,
-                "response_text": None,
-                "response_shown": False,
-                "sending": False,
-            }
-        )
+        self.screenshot_bytes = None
+        self.screenshot_data_url = None
+        self.screenshot_loaded = False
+        self.response_text = None
+        self.response_shown = False
+        self.sending = False
         self._update_status("Ready")
 
     def _cleanup_and_quit(self):
+        # release the GDI device contexts held by mss
+        try:
+            self._sct.close()
+        except Exception:
+            pass
         try:
             self.root.quit()
             self.root.destroy()
@@ -1102,21 +1670,21 @@ class ScreenshotApp:
 # -----------------------
 def check_single_instance():
     """Check if another instance is already running. Returns True if this is the only instance."""
-    if ctypes is None:
+    if _kernel32 is None:
         # If we can't use Windows API, skip the check (shouldn't happen on Windows)
         return True
     
     mutex_name = f"Global\\{APP_NAME}_SingleInstance"
     try:
         # Try to create a named mutex
-        mutex = ctypes.windll.kernel32.CreateMutexW(
+        mutex = _kernel32.CreateMutexW(
             None,  # Default security attributes
             True,  # Initial owner
             mutex_name
         )
         
         # Check if the mutex already existed (error code 183 = ERROR_ALREADY_EXISTS)
-        last_error = ctypes.windll.kernel32.GetLastError()
+        last_error = ctypes.get_last_error()
         if last_error == 183:  # ERROR_ALREADY_EXISTS
             print(f"Another instance of {APP_NAME} is already running.", flush=True)
             return False
@@ -4,6 +4,7 @@ import tkinter as tk
 from typing import Optional, Tuple, Callable
 
 
+from config import SELECTOR_HIDE_FALLBACK_MS
 from utils import get_screen_scale
 
 class Screenshot:
@@ -18,6 +19,7 @@ class Screenshot:
         
         self.start_coords = None
         self.final_coords = None
+        self._fallback_id = None
 
     def _create_window(self):
         """Create the transparent selection window."""
@@ -37,7 +39,6 @@ class Screenshot:
     def _setup_bindings(self):
         """Setup mouse and keyboard bindings."""
         self.canvas.bind("<ButtonPress-1>", self._on_mouse_press)
-        self.canvas.bind("<B1-Motion>", self._on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self._on_mouse_release)
         self.window.bind("<Escape>", self._cancel)
 
@@ -45,10 +46,6 @@ class Screenshot:
         """Handle mouse button press."""
         self.start_coords = (event.x_root, event.y_root)
 
-    def _on_mouse_drag(self, event):
-        """Handle mouse drag (optional: could add visual feedback)."""
-        pass
-
     def _on_mouse_release(self, event):
         """Handle mouse button release."""
         if not self.start_coords:
@@ -74,13 +71,24 @@ class Screenshot:
 
     def _complete(self):
         """Complete selection and call callback."""
+        # Finish as soon as Tk reports the window unmapped; the timer only covers a missing <Unmap>
+        self.window.bind("<Unmap>", self._on_unmap)
+        self._fallback_id = self.master.after(SELECTOR_HIDE_FALLBACK_MS, self._finish)
         self.window.withdraw()
-        self.master.after(150, self._finish)
+
+    def _on_unmap(self, event):
+        """Finish once the selector window itself is unmapped."""
+        if event.widget is self.window:
+            self._finish()
 
     def _finish(self):
         """Finalize selection."""
-        if self.final_coords:
-            self.on_complete(self.final_coords)
+        if self._fallback_id is not None:
+            self.master.after_cancel(self._fallback_id)
+            self._fallback_id = None
+        coords, self.final_coords = self.final_coords, None
+        if coords:
+            self.on_complete(coords)
         self._destroy()
 
     def _cancel(self, event=None):
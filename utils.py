@@ -1,19 +1,26 @@
 """Utility functions for Moodler application."""
 
-import base64
+import functools
 import json
 import logging
 import os
+import re
 from pathlib import Path
 from typing import Optional
 
 import ctypes
 
-from config import APP_NAME
+try:
+    import pybase64 as base64  # SIMD base64; same b64encode API as the stdlib module
+except ImportError:
+    import base64
+
+from config import APP_NAME, CACHE_DIR_NAME
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 
+@functools.lru_cache(maxsize=None)
 def get_appdata_path() -> Path:
     """Return path to application data directory."""
     appdata = os.getenv("APPDATA") or str(Path.home() / "AppData" / "Roaming")
@@ -25,6 +32,11 @@ def get_config_path() -> Path:
     """Return path to config file."""
     return get_appdata_path() / "config.json"
 
+def get_cache_path() -> Path:
+    """Return path to response cache directory."""
+    local_appdata = os.getenv("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    return Path(local_appdata) / APP_NAME / CACHE_DIR_NAME
+
 def load_api_key() -> Optional[str]:
     """Load API key from config file."""
     config_file = get_config_path()
@@ -61,9 +73,12 @@ def delete_api_key() -> bool:
         logging.error(f"Failed to delete API key: {e}")
         return False
 
+# "sk-" plus at least 7 key characters; also rejects stray whitespace and non-ASCII pastes
+_API_KEY_RE = re.compile(r"sk-[A-Za-z0-9_\-]{7,}")
+
 def is_valid_api_key(api_key: Optional[str]) -> bool:
     """Check if API key looks valid."""
-    return bool(api_key and api_key.startswith("sk-") and len(api_key) >= 10)
+    return bool(api_key and _API_KEY_RE.fullmatch(api_key))
 
 def ensure_dpi_awareness():
     """Set process DPI awareness for better high-DPI behavior."""
@@ -95,7 +110,8 @@ def get_screen_scale(hwnd: Optional[int] = None) -> float:
     except Exception:
         return 1.0
 
-def encode_image_to_base64(image_path: str) -> str:
-    """Encode image file to base64 string."""
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
\ No newline at end of file
+def encode_image_to_data_url(image_data, mime_type: str = "image/png") -> str:
+    """Encode image bytes to a base64 data URL."""
+    data_url = bytearray(f"data:{mime_type};base64,".encode("ascii"))
+    data_url += base64.b64encode(image_data)
+    return data_url.decode("ascii")
\ No newline at end of file